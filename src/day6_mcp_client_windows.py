@@ -0,0 +1,619 @@
+#!/usr/bin/env python3
+"""
+第6天：Windows兼容的MCP客户端
+在Windows下 stdio_client 可能报 UnsupportedOperation: fileno，
+这里直接用子进程stdio收发JSON-RPC消息，绕开该限制
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+try:
+    # orjson 直接输出bytes且比标准库快数倍，作为热路径的首选编解码器
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        """序列化为带换行的UTF-8字节串"""
+        return orjson.dumps(obj) + b"\n"
+
+    def _dumps_compact(obj) -> str:
+        """序列化为紧凑JSON字符串（模板填充用）"""
+        return orjson.dumps(obj).decode("utf-8")
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        """标准库回退：序列化为带换行的UTF-8字节串"""
+        return (json.dumps(obj) + "\n").encode("utf-8")
+
+    def _dumps_compact(obj) -> str:
+        """标准库回退：序列化为紧凑JSON字符串"""
+        return json.dumps(obj, separators=(",", ":"))
+
+    _loads = json.loads
+
+# 路径只在导入时解析一次，避免各函数重复 abspath/stat
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_ROOT = os.path.dirname(_HERE)
+SERVER_SCRIPT = os.path.join(_HERE, "day6_mcp_server_simple.py")
+_SERVER_EXISTS = os.path.exists(SERVER_SCRIPT)
+
+# 保证可以从仓库根目录或 src/ 目录运行
+sys.path.append(_ROOT)
+
+# 工具列表磁盘缓存：键为脚本路径+mtime，并设TTL，
+# 服务器脚本被修改后会自动重新发现
+_TOOL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai-guide")
+_TOOL_CACHE_TTL = 300  # 秒
+
+# 子进程stdout读取缓冲上限。
+# 消息帧采用MCP stdio规定的"一行一条JSON"格式——LSP式的
+# Content-Length帧虽然可以一次read(n)取整条消息，但stdio_server
+# 只认按行分隔的JSON，这里保持协议兼容：每条消息一次整体write
+# （单个系统调用）+ 缓冲readline，不再有逐字符的无缓冲I/O
+_STREAM_LIMIT = 1 << 20  # 1MB
+
+
+def _tool_cache_path(server_script: str) -> str:
+    """计算工具缓存文件路径"""
+    import hashlib
+    mtime = os.path.getmtime(server_script) if os.path.exists(server_script) else 0
+    key = hashlib.sha1(f"{os.path.abspath(server_script)}:{mtime}".encode("utf-8")).hexdigest()
+    return os.path.join(_TOOL_CACHE_DIR, f"mcp-tools-win-{key}.json")
+
+
+def _load_tool_cache(server_script: str):
+    """读取未过期的工具缓存，未命中返回 None"""
+    import time
+    try:
+        cache_path = _tool_cache_path(server_script)
+        if os.path.exists(cache_path):
+            if time.time() - os.path.getmtime(cache_path) < _TOOL_CACHE_TTL:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+    except Exception:
+        pass
+    return None
+
+
+def _save_tool_cache(server_script: str, tools) -> None:
+    """写入工具缓存，失败不影响正常流程"""
+    try:
+        os.makedirs(_TOOL_CACHE_DIR, exist_ok=True)
+        with open(_tool_cache_path(server_script), "w", encoding="utf-8") as f:
+            json.dump(tools, f, ensure_ascii=False)
+    except Exception:
+        pass
+
+
+class WindowsMCPClient:
+    """
+    Windows兼容的MCP客户端
+    直接通过子进程的标准输入输出收发JSON-RPC消息
+
+    管道收发全程走bytes并显式指定UTF-8：不经过TextIOWrapper的
+    增量编解码层，也不受Windows本地化locale默认编码的影响
+    （非ASCII参数在GBK等默认编码下会错码）
+    """
+
+    def __init__(self, server_script: str, timeout_s: float = 30.0,
+                 max_failures: int = 3):
+        """
+        初始化客户端
+
+        参数:
+            server_script: MCP服务器脚本路径
+            timeout_s: 单个请求的超时时间（秒）
+            max_failures: 触发服务器重启的连续失败次数
+        """
+        self.server_script = server_script
+        self.timeout_s = timeout_s
+        self.max_failures = max_failures
+        self.process = None
+        # 请求id单调递增，保证并发在途的请求可按id对齐响应
+        self._next_id = 0
+        # 只保护stdin写入：StreamWriter在并发写者下不保证原子性；
+        # 读取由唯一的后台读取泵负责，写读不再成对串行
+        self._write_lock = asyncio.Lock()
+        # 在途请求表：id -> Future，由读取泵按响应id逐个兑现
+        self._pending = {}
+        self._reader_task = None
+        # 连续失败计数：卡死的服务器不应拖垮整个会话
+        self._consecutive_failures = 0
+        # 后台stderr消费任务
+        self._stderr_task = None
+
+    async def start_server(self):
+        """
+        启动MCP服务器子进程（异步stdio，不阻塞事件循环）
+
+        关于Windows命名管道：Python 3.8+ 默认的 ProactorEventLoop
+        在实现子进程PIPE时，底层用的就是重叠I/O的命名管道
+        （\\\\.\\pipe\\...）并经由IOCP完成端口收发，而不是每次读写
+        都陷入内核的匿名管道。因此走 asyncio.create_subprocess_exec
+        已经获得命名管道的低开销IPC，无需再手写ctypes传输层。
+        """
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, self.server_script,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=_STREAM_LIMIT  # 防止大响应撑爆默认64KB行上限
+        )
+        # 后台持续消费子进程stderr：既防止服务器日志塞满管道，
+        # 也让启动阶段的早期输出即时可见
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+        # 唯一的读取泵：持续readline并按id兑现在途请求的Future，
+        # 写与读解耦后多个 call_tool 可在同一条管道上并发在途
+        self._pending = {}
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        """
+        后台读取泵：逐行读取服务器响应并派发给对应的在途请求
+
+        单条响应按 id 兑现 self._pending 中的Future；批量响应
+        （JSON数组）拆开后逐个兑现。管道EOF时让所有在途请求
+        以 ConnectionError 失败，避免调用方无限等待
+        """
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    msg = _loads(line)
+                except Exception:
+                    continue  # 服务器混入的非JSON输出直接忽略
+                items = msg if isinstance(msg, list) else [msg]
+                for item in items:
+                    fut = self._pending.pop(item.get("id"), None)
+                    if fut is not None and not fut.done():
+                        fut.set_result(item)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._fail_pending(ConnectionError("服务器连接已断开"))
+
+    def _fail_pending(self, exc: Exception):
+        """让所有在途请求以给定异常结束"""
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+        self._pending.clear()
+
+    async def _drain_stderr(self):
+        """持续读取并丢弃（必要时可打印）子进程的stderr输出"""
+        try:
+            while True:
+                line = await self.process.stderr.readline()
+                if not line:
+                    break
+                if os.environ.get("MCP_DEBUG"):
+                    print(f"[server] {line.decode('utf-8', 'replace').rstrip()}")
+        except (asyncio.CancelledError, AttributeError):
+            pass
+
+    async def _dispatch(self, frame: bytes, rids: list) -> list:
+        """
+        写入一条已编码的消息帧，等待读取泵兑现其中全部请求id
+
+        只写不读：响应由后台读取泵按id派发，因此多个调用可以
+        并发在途，总耗时从各调用延迟之和降到最慢一次的延迟
+        """
+        loop = asyncio.get_running_loop()
+        futures = []
+        for rid in rids:
+            fut = loop.create_future()
+            self._pending[rid] = fut
+            futures.append(fut)
+
+        try:
+            async with self._write_lock:
+                self.process.stdin.write(frame)
+                await self.process.stdin.drain()
+            return await asyncio.gather(*futures)
+        except BaseException:
+            # 超时/取消时清掉本次注册的在途表项，防止泄漏
+            for rid in rids:
+                self._pending.pop(rid, None)
+            raise
+
+    async def _send_frame(self, frame: bytes, rids: list) -> list:
+        """
+        带超时和失败熔断的消息发送
+
+        每个请求用 wait_for 限时，避免卡死的服务器无限占用客户端；
+        连续失败达到 max_failures 次时重启服务器进程并重试一次
+        """
+        try:
+            result = await asyncio.wait_for(
+                self._dispatch(frame, rids), timeout=self.timeout_s
+            )
+            self._consecutive_failures = 0
+            return result
+        except Exception:
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.max_failures:
+                print(f"⚠️ 连续失败 {self._consecutive_failures} 次，重启服务器...")
+                await self._restart_server()
+                result = await asyncio.wait_for(
+                    self._dispatch(frame, rids), timeout=self.timeout_s
+                )
+                self._consecutive_failures = 0
+                return result
+            raise
+
+    async def _restart_server(self):
+        """关闭疑似卡死的服务器并重新启动+握手"""
+        await self.close()
+        await self.start_server()
+        await self.initialize()
+        self._consecutive_failures = 0
+
+    async def send_request(self, request: dict) -> dict:
+        """
+        发送单个JSON-RPC请求并等待响应
+
+        参数:
+            request: JSON-RPC请求对象（缺少id时自动分配）
+
+        返回:
+            JSON-RPC响应对象
+        """
+        if "id" not in request:
+            request["id"] = self._alloc_id()
+        responses = await self._send_frame(_dumps(request), [request["id"]])
+        return responses[0]
+
+    async def send_batch(self, requests: list) -> list:
+        """
+        发送JSON-RPC批量请求（请求对象数组）
+
+        按MCP 2025-03-26规范，互相独立的请求可打包为一个JSON数组，
+        服务器在一次往返内处理全部请求，把N次stdio往返压缩为1次。
+
+        参数:
+            requests: JSON-RPC请求对象列表（每个请求需有唯一id）
+
+        返回:
+            与请求同序的响应对象列表（读取泵按id对齐，与服务器
+            返回顺序无关）
+        """
+        rids = [req["id"] for req in requests]
+        return await self._send_frame(_dumps(requests), rids)
+
+    def _alloc_id(self) -> int:
+        """分配下一个请求id"""
+        rid = self._next_id
+        self._next_id += 1
+        return rid
+
+    async def initialize(self) -> dict:
+        """
+        发送初始化握手请求
+
+        不用固定sleep等服务器就绪：读取泵阻塞在readline上，
+        服务器导入完成并应答的瞬间Future即被兑现
+        """
+        request = {
+            "jsonrpc": "2.0",
+            "id": self._alloc_id(),
+            "method": "initialize",
+            "params": {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {"tools": {}},
+                "clientInfo": {"name": "windows-client", "version": "1.0.0"}
+            }
+        }
+
+        try:
+            # 握手需容忍服务器冷启动导入MCP栈的时间，限时放宽到10秒
+            responses = await asyncio.wait_for(
+                self._dispatch(_dumps(request), [request["id"]]), timeout=10
+            )
+        except asyncio.TimeoutError:
+            raise ConnectionError("服务器初始化超时")
+
+        # 按MCP规范补发initialized通知（无id，服务器不回应答）：
+        # mcp SDK的Server在收到该通知前会拒绝一切后续请求
+        async with self._write_lock:
+            self.process.stdin.write(_INITIALIZED_NOTIFICATION)
+            await self.process.stdin.drain()
+
+        return responses[0]
+
+    async def list_tools(self) -> dict:
+        """获取服务器的工具列表（带磁盘缓存）"""
+        cached = _load_tool_cache(self.server_script)
+        if cached is not None:
+            return cached
+
+        # 静态模板只填id，免去字典构造和完整序列化
+        rid = self._alloc_id()
+        frame = _LIST_TOOLS_TMPL.format(id=rid).encode("utf-8")
+        response = (await self._send_frame(frame, [rid]))[0]
+        _save_tool_cache(self.server_script, response)
+        return response
+
+    async def call_tool(self, name: str, arguments: dict) -> dict:
+        """
+        调用指定工具
+
+        参数:
+            name: 工具名称
+            arguments: 工具参数
+
+        返回:
+            JSON-RPC响应对象
+        """
+        # 模板只需填充id/工具名，参数单独做一次紧凑序列化
+        rid = self._alloc_id()
+        frame = _CALL_TOOL_TMPL.format(
+            id=rid,
+            name=name,
+            args=_dumps_compact(arguments)
+        ).encode("utf-8")
+        return (await self._send_frame(frame, [rid]))[0]
+
+    async def close(self):
+        """关闭服务器进程"""
+        for task_attr in ("_reader_task", "_stderr_task"):
+            task = getattr(self, task_attr, None)
+            if task is not None:
+                task.cancel()
+                setattr(self, task_attr, None)
+        self._fail_pending(ConnectionError("客户端已关闭"))
+        if self.process:
+            try:
+                self.process.terminate()
+                await asyncio.wait_for(self.process.wait(), timeout=5)
+            except Exception:
+                self.process.kill()
+            self.process = None
+
+
+# 静态请求模板：jsonrpc/method等字段跨调用不变，预先展开为
+# 带占位符的字符串，发送时只填id和参数，免去每次的字典构造
+# 和递归序列化
+# initialize应答后必须发送的通知，完成握手的最后一步
+_INITIALIZED_NOTIFICATION = b'{"jsonrpc":"2.0","method":"notifications/initialized"}\n'
+
+_LIST_TOOLS_TMPL = '{{"jsonrpc":"2.0","id":{id},"method":"tools/list","params":{{}}}}\n'
+_CALL_TOOL_TMPL = (
+    '{{"jsonrpc":"2.0","id":{id},"method":"tools/call",'
+    '"params":{{"name":"{name}","arguments":{args}}}}}\n'
+)
+
+
+# 进程级客户端缓存：同一Python进程内（典型场景是Jupyter反复执行单元格）
+# 重复请求同一服务器脚本时复用热进程，MCP/FastMCP的导入开销只付一次
+_CLIENT_CACHE: dict = {}
+_CACHE_LOCK = asyncio.Lock()
+_CACHE_STATS = {"hits": 0, "misses": 0}
+
+
+async def get_or_create_client(server_script: str) -> WindowsMCPClient:
+    """
+    获取或创建指定服务器脚本的客户端（带进程缓存）
+
+    参数:
+        server_script: MCP服务器脚本路径
+
+    返回:
+        已完成启动和初始化握手的客户端
+    """
+    async with _CACHE_LOCK:
+        cached = _CLIENT_CACHE.get(server_script)
+        if cached is not None and cached.process is not None \
+                and cached.process.returncode is None:
+            _CACHE_STATS["hits"] += 1
+            return cached
+
+        _CACHE_STATS["misses"] += 1
+        client = WindowsMCPClient(server_script)
+        await client.start_server()
+        # initialize 自带就绪轮询，无需固定sleep
+        await client.initialize()
+        _CLIENT_CACHE[server_script] = client
+        return client
+
+
+def get_cache_stats() -> dict:
+    """返回客户端缓存的命中统计"""
+    return dict(_CACHE_STATS)
+
+
+async def close_cached_clients():
+    """关闭并清空所有缓存的客户端进程"""
+    async with _CACHE_LOCK:
+        for client in _CLIENT_CACHE.values():
+            await client.close()
+        _CLIENT_CACHE.clear()
+
+
+async def test_math_tools_windows():
+    """
+    Windows环境下的MCP客户端测试
+    依次验证数学工具的各种运算
+    """
+    print("🔧 Windows MCP客户端测试")
+    print("=" * 50)
+
+    if not _SERVER_EXISTS:
+        print(f"❌ 服务器脚本不存在: {SERVER_SCRIPT}")
+        return
+
+    try:
+        print("📡 获取MCP服务器连接（缓存命中时复用热进程）...")
+        client = await get_or_create_client(SERVER_SCRIPT)
+        print(f"✅ 连接就绪，缓存统计: {get_cache_stats()}")
+
+        print("\n📋 获取工具列表...")
+        tools_response = await client.list_tools()
+        for tool in tools_response.get("result", {}).get("tools", []):
+            print(f"  🔸 {tool['name']}: {tool.get('description', '')}")
+
+        # 测试用例：(工具名, 参数, 描述)
+        test_cases = [
+            ("add", {"a": 10, "b": 25}, "加法 (10 + 25)"),
+            ("multiply", {"a": 7, "b": 8}, "乘法 (7 × 8)"),
+            ("divide", {"a": 100, "b": 4}, "除法 (100 ÷ 4)"),
+            ("divide", {"a": 10, "b": 0}, "除以零 (10 ÷ 0)"),
+            ("power", {"a": 2, "b": 10}, "幂运算 (2^10)"),
+            ("multiply", {"a": 3.14, "b": 2.5}, "浮点数 (3.14 × 2.5)"),
+            ("unknown_tool", {"a": 1, "b": 2}, "错误的工具名"),
+        ]
+
+        # 各用例互相独立，优先整表编译成一个JSON-RPC批量请求：
+        # 7次 stdin写+stdout读 的往返压缩为1次数组写+1次数组读
+        print("\n🧮 测试数学运算（优先单次批量往返）：")
+        batch = [
+            {
+                "jsonrpc": "2.0",
+                "id": client._alloc_id(),
+                "method": "tools/call",
+                "params": {"name": tool_name, "arguments": args}
+            }
+            for tool_name, args, _ in test_cases
+        ]
+        try:
+            responses = await client.send_batch(batch)
+        except Exception as e:
+            # mcp SDK的stdio传输按行校验单个消息对象，不接受顶层数组，
+            # 批量失败时回退为并发单请求：仍在同一条管道上并发在途，
+            # 总耗时约等于最慢一次调用
+            print(f"⚠️ 服务器不支持批量请求（{e}），回退为并发单请求")
+            responses = await asyncio.gather(*[
+                client.call_tool(tool_name, args)
+                for tool_name, args, _ in test_cases
+            ])
+
+        # 响应与用例同序，zip后本地打印，不再有任何额外IPC
+        for i, ((_, _, description), response) in enumerate(
+            zip(test_cases, responses), 1
+        ):
+            print(f"\n{i}. 测试{description}:")
+            if "error" in response:
+                print(f"   错误: {response['error'].get('message', response['error'])}")
+            else:
+                content = response.get("result", {}).get("content", [])
+                text = content[0].get("text", "") if content else str(response)
+                print(f"   结果: {text}")
+
+        print("\n✅ 所有测试完成！")
+
+    except Exception as e:
+        print(f"❌ 测试失败: {e}")
+        print("💡 请确保已安装 mcp 包: pip install mcp")
+    # 不在这里关闭客户端：留在缓存中供同进程的后续调用复用
+
+
+async def simple_manual_test():
+    """
+    手动构造JSON-RPC消息的最小连通性测试
+    便于理解MCP底层协议格式
+    """
+    print("\n🔬 手动JSON-RPC连通性测试")
+    print("=" * 50)
+
+    try:
+        # 复用缓存的热进程（已完成初始化握手）
+        client = await get_or_create_client(SERVER_SCRIPT)
+
+        # 手动构造tools/list请求，观察原始协议格式
+        list_request = {
+            "jsonrpc": "2.0",
+            "id": client._alloc_id(),
+            "method": "tools/list",
+            "params": {}
+        }
+        print(f"➡️ 发送: {json.dumps(list_request, ensure_ascii=False)}")
+        response = await client.send_request(list_request)
+        print(f"⬅️ 收到: {json.dumps(response, ensure_ascii=False)[:200]}...")
+
+        # 批量请求示例：一次往返完成两个独立调用
+        batch = [
+            {
+                "jsonrpc": "2.0",
+                "id": 10,
+                "method": "tools/call",
+                "params": {"name": "add", "arguments": {"a": 1, "b": 2}}
+            },
+            {
+                "jsonrpc": "2.0",
+                "id": 11,
+                "method": "tools/call",
+                "params": {"name": "power", "arguments": {"a": 2, "b": 8}}
+            }
+        ]
+        print(f"\n➡️ 发送批量请求（{len(batch)} 个调用，1次往返）...")
+        try:
+            responses = await client.send_batch(batch)
+            for resp in responses:
+                print(f"⬅️ 收到 (id={resp.get('id')}): {resp.get('result', resp)}")
+        except Exception as e:
+            print(f"⚠️ 服务器可能不支持批量请求: {e}")
+
+    except Exception as e:
+        print(f"❌ 测试失败: {e}")
+
+
+def check_environment():
+    """检查运行环境是否满足要求"""
+    print("🔍 环境检查")
+    print("=" * 50)
+
+    print(f"Python版本: {sys.version.split()[0]}")
+    print(f"运行平台: {sys.platform}")
+
+    try:
+        import mcp  # noqa: F401
+        print("✅ mcp 包已安装")
+    except ImportError:
+        print("❌ 未安装 mcp 包，请运行: pip install mcp")
+        return False
+
+    if _SERVER_EXISTS:
+        print(f"✅ 服务器脚本存在: {SERVER_SCRIPT}")
+    else:
+        print(f"❌ 服务器脚本不存在: {SERVER_SCRIPT}")
+        return False
+
+    return True
+
+
+async def main():
+    """主函数"""
+    print("Windows兼容MCP客户端演示")
+    print("=" * 50)
+
+    # 先把服务器预热任务排上事件循环，再做本地环境检查：
+    # 子进程导入MCP栈的约1秒开销与客户端的CPU工作在墙钟上重叠
+    warmup_task = asyncio.create_task(get_or_create_client(SERVER_SCRIPT))
+
+    if not await asyncio.to_thread(check_environment):
+        warmup_task.cancel()
+        return
+
+    print("\n1. 运行自动测试")
+    print("2. 手动JSON-RPC测试")
+    choice = input("\n选择 (1/2): ").strip()
+
+    try:
+        if choice == "1":
+            await test_math_tools_windows()
+        elif choice == "2":
+            await simple_manual_test()
+        else:
+            print("无效的选择")
+    finally:
+        # 脚本退出前统一清理缓存的服务器进程
+        await close_cached_clients()
+        print("🔌 服务器进程已关闭")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -20,6 +20,59 @@ from mcp.types import (
 # 创建MCP服务器实例
 server = Server("math-tools")
 
+# 工具定义是静态的：导入时构建一次，聊天客户端反复list_tools时
+# 不再每次重建Tool对象和嵌套的inputSchema字典
+_TOOLS = (
+    Tool(
+        name="add",
+        description="将两个数字相加",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "a": {"type": "number", "description": "第一个数"},
+                "b": {"type": "number", "description": "第二个数"}
+            },
+            "required": ["a", "b"]
+        }
+    ),
+    Tool(
+        name="multiply",
+        description="将两个数字相乘",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "a": {"type": "number", "description": "第一个数"},
+                "b": {"type": "number", "description": "第二个数"}
+            },
+            "required": ["a", "b"]
+        }
+    ),
+    Tool(
+        name="divide",
+        description="将第一个数除以第二个数",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "a": {"type": "number", "description": "被除数"},
+                "b": {"type": "number", "description": "除数（不能为0）"}
+            },
+            "required": ["a", "b"]
+        }
+    ),
+    Tool(
+        name="power",
+        description="计算a的b次方",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "a": {"type": "number", "description": "底数"},
+                "b": {"type": "number", "description": "指数"}
+            },
+            "required": ["a", "b"]
+        }
+    )
+)
+
 # 定义可用的工具
 @server.list_tools()
 async def handle_list_tools() -> list[Tool]:
@@ -27,56 +80,53 @@ async def handle_list_tools() -> list[Tool]:
     列出所有可用的工具
     这个方法告诉客户端服务器提供哪些工具
     """
-    return [
-        Tool(
-            name="add",
-            description="将两个数字相加",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "a": {"type": "number", "description": "第一个数"},
-                    "b": {"type": "number", "description": "第二个数"}
-                },
-                "required": ["a", "b"]
-            }
-        ),
-        Tool(
-            name="multiply",
-            description="将两个数字相乘",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "a": {"type": "number", "description": "第一个数"},
-                    "b": {"type": "number", "description": "第二个数"}
-                },
-                "required": ["a", "b"]
-            }
-        ),
-        Tool(
-            name="divide",
-            description="将第一个数除以第二个数",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "a": {"type": "number", "description": "被除数"},
-                    "b": {"type": "number", "description": "除数（不能为0）"}
-                },
-                "required": ["a", "b"]
-            }
-        ),
-        Tool(
-            name="power",
-            description="计算a的b次方",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "a": {"type": "number", "description": "底数"},
-                    "b": {"type": "number", "description": "指数"}
-                },
-                "required": ["a", "b"]
-            }
-        )
-    ]
+    return list(_TOOLS)
+
+# 各工具的具体实现：拆成小函数后由派发表按名称查找
+async def _do_add(arguments: Dict[str, Any]) -> list[TextContent]:
+    """加法工具"""
+    result = arguments["a"] + arguments["b"]
+    return [TextContent(
+        type="text",
+        text=f"{arguments['a']} + {arguments['b']} = {result}"
+    )]
+
+async def _do_multiply(arguments: Dict[str, Any]) -> list[TextContent]:
+    """乘法工具"""
+    result = arguments["a"] * arguments["b"]
+    return [TextContent(
+        type="text",
+        text=f"{arguments['a']} × {arguments['b']} = {result}"
+    )]
+
+async def _do_divide(arguments: Dict[str, Any]) -> list[TextContent]:
+    """除法工具"""
+    if arguments["b"] == 0:
+        return [TextContent(
+            type="text",
+            text="错误：除数不能为0"
+        )]
+    result = arguments["a"] / arguments["b"]
+    return [TextContent(
+        type="text",
+        text=f"{arguments['a']} ÷ {arguments['b']} = {result}"
+    )]
+
+async def _do_power(arguments: Dict[str, Any]) -> list[TextContent]:
+    """幂运算工具"""
+    result = arguments["a"] ** arguments["b"]
+    return [TextContent(
+        type="text",
+        text=f"{arguments['a']} ^ {arguments['b']} = {result}"
+    )]
+
+# 工具名到实现的派发表：O(1)哈希查找替代逐个字符串比较
+_DISPATCH = {
+    "add": _do_add,
+    "multiply": _do_multiply,
+    "divide": _do_divide,
+    "power": _do_power,
+}
 
 # 实现工具调用处理
 @server.call_tool()
@@ -86,48 +136,17 @@ async def handle_call_tool(
 ) -> list[TextContent]:
     """
     处理工具调用请求
-    根据工具名称执行相应的操作
+    按派发表查找对应的工具实现
     """
+    handler = _DISPATCH.get(name)
+    if handler is None:
+        return [TextContent(
+            type="text",
+            text=f"错误：未知的工具 '{name}'"
+        )]
+
     try:
-        if name == "add":
-            result = arguments["a"] + arguments["b"]
-            return [TextContent(
-                type="text",
-                text=f"{arguments['a']} + {arguments['b']} = {result}"
-            )]
-        
-        elif name == "multiply":
-            result = arguments["a"] * arguments["b"]
-            return [TextContent(
-                type="text",
-                text=f"{arguments['a']} × {arguments['b']} = {result}"
-            )]
-        
-        elif name == "divide":
-            if arguments["b"] == 0:
-                return [TextContent(
-                    type="text",
-                    text="错误：除数不能为0"
-                )]
-            result = arguments["a"] / arguments["b"]
-            return [TextContent(
-                type="text",
-                text=f"{arguments['a']} ÷ {arguments['b']} = {result}"
-            )]
-        
-        elif name == "power":
-            result = arguments["a"] ** arguments["b"]
-            return [TextContent(
-                type="text",
-                text=f"{arguments['a']} ^ {arguments['b']} = {result}"
-            )]
-        
-        else:
-            return [TextContent(
-                type="text",
-                text=f"错误：未知的工具 '{name}'"
-            )]
-    
+        return await handler(arguments)
     except Exception as e:
         return [TextContent(
             type="text",